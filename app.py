@@ -4,14 +4,23 @@ A Streamlit web application to convert images (including handwritten notes) into
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from PIL import Image
+import numpy as np
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import io
 
 # Import utility modules
 from utils.ocr_processor import OCRProcessor
 from utils.docx_generator import DocxGenerator
+from utils.batch_queue import BatchQueue
+
+
+# Longest image side handed to OCR; larger uploads are downscaled first
+MAX_IMAGE_SIDE = 1600
 
 
 # Page configuration
@@ -24,7 +33,10 @@ st.set_page_config(
 
 
 # Custom CSS for better UI
-st.markdown("""
+# Emitted on every full rerun on purpose: Streamlit removes any element a rerun
+# does not re-render, so a once-per-session flag would drop the styles after the
+# first interaction. Text edits rerun only the _text_panel fragment and skip this.
+_CSS = """
     <style>
     .main-header {
         font-size: 3rem;
@@ -55,12 +67,13 @@ st.markdown("""
         margin: 1rem 0;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS, unsafe_allow_html=True)
 
 
 # Initialize session state
-if 'ocr_processor' not in st.session_state:
-    st.session_state.ocr_processor = None
+if 'ocr_config' not in st.session_state:
+    st.session_state.ocr_config = None
 if 'extracted_text' not in st.session_state:
     st.session_state.extracted_text = ""
 if 'confidence_score' not in st.session_state:
@@ -69,45 +82,115 @@ if 'processing_time' not in st.session_state:
     st.session_state.processing_time = 0.0
 
 
+@st.cache_resource(show_spinner=False)
+def _get_ocr(engine: str, languages: tuple, gpu: bool):
+    """Load an OCR processor once per process and share it across sessions and reruns"""
+    processor = OCRProcessor(engine=engine, languages=list(languages), gpu=gpu)
+    processor.initialize_reader()
+    return processor
+
+
 def initialize_ocr(engine='easyocr', languages=['en'], gpu=False):
     """Initialize OCR processor with progress indicator"""
-    if st.session_state.ocr_processor is None:
-        spinner_messages = {
-            'trocr': '🔄 Initializing TrOCR (~300MB download on first run - may take 2-3 minutes)...',
-            'paddleocr': '🔄 Initializing PaddleOCR (may take 1-2 minutes)...',
-            'easyocr': '🔄 Initializing EasyOCR (downloading models on first run - may take 1-2 minutes)...'
-        }
-        
-        with st.spinner(spinner_messages.get(engine, '🔄 Initializing OCR engine...')):
-            try:
-                processor = OCRProcessor(engine=engine, languages=languages, gpu=gpu)
-                processor.initialize_reader()
-                st.session_state.ocr_processor = processor
-            except Exception as e:
-                st.error(f"Failed to initialize {engine}: {str(e)}")
-                raise
-    return st.session_state.ocr_processor
+    config = (engine, tuple(languages), gpu)
+    spinner_messages = {
+        'trocr': '🔄 Initializing TrOCR (~300MB download on first run - may take 2-3 minutes)...',
+        'paddleocr': '🔄 Initializing PaddleOCR (may take 1-2 minutes)...',
+        'easyocr': '🔄 Initializing EasyOCR (downloading models on first run - may take 1-2 minutes)...'
+    }
+    
+    with st.spinner(spinner_messages.get(engine, '🔄 Initializing OCR engine...')):
+        try:
+            processor = _get_ocr(*config)
+            st.session_state.ocr_config = config
+        except Exception as e:
+            st.error(f"Failed to initialize {engine}: {str(e)}")
+            raise
+    return processor
+
 
+def _decode(image_bytes):
+    """Decode uploaded bytes into an RGB numpy array, capped at MAX_IMAGE_SIDE pixels"""
+    image = Image.open(io.BytesIO(image_bytes))
+    if max(image.size) > MAX_IMAGE_SIDE:
+        # thumbnail() lets the JPEG decoder downscale while decoding
+        image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+    return np.asarray(image.convert('RGB'))
 
-def process_image(image, preserve_structure=True):
-    """Process image and extract text"""
-    processor = st.session_state.ocr_processor
+
+@st.cache_resource(show_spinner=False)
+def _get_batch_queue(engine: str, languages: tuple, gpu: bool, preserve_structure: bool):
+    """One batching worker per processor, coalescing extraction requests from all sessions"""
+    processor = _get_ocr(engine, languages, gpu)
+    
+    def run_batch(images_bytes):
+        # Decode each upload to an RGB array once at the boundary
+        images = [_decode(image_bytes) for image_bytes in images_bytes]
+        return processor.extract_text_batch(images, preserve_structure=preserve_structure, with_confidence=True)
     
-    if processor is None:
+    return BatchQueue(run_batch, max_batch_size=8, max_wait_time=0.1)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_executor():
+    """Threads that wait on OCR results so the script thread can keep the page updated"""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix='ocr')
+
+
+@st.cache_data(show_spinner=False)
+def _extract(image_bytes: bytes, engine: str, languages: tuple, gpu: bool, preserve_structure: bool):
+    """Run OCR on the uploaded bytes, memoized so reruns on the same file skip inference"""
+    batch_queue = _get_batch_queue(engine, languages, gpu, preserve_structure)
+    return batch_queue.submit(image_bytes).result()
+
+
+@st.cache_data(show_spinner=False)
+def _extract_batch(images_bytes: tuple, engine: str, languages: tuple, gpu: bool, preserve_structure: bool):
+    """Run OCR on several uploads through the batching worker, memoized like _extract"""
+    batch_queue = _get_batch_queue(engine, languages, gpu, preserve_structure)
+    futures = [batch_queue.submit(image_bytes) for image_bytes in images_bytes]
+    return [future.result() for future in futures]
+
+
+def _run_in_background(fn, *args):
+    """Submit fn to the executor with this session's script context attached"""
+    ctx = get_script_run_ctx()
+    
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    
+    return _get_executor().submit(run)
+
+
+def process_image(images_bytes, preserve_structure=True):
+    """Process one or more images and extract text (pages are separated by a blank line)"""
+    if st.session_state.ocr_config is None:
         st.error("❌ OCR processor not initialized. Please initialize first.")
         return None, 0.0, 0.0
     
     start_time = time.time()
     
     try:
-        # Extract text
-        if preserve_structure:
-            text = processor.extract_text_with_structure(image)
+        if len(images_bytes) == 1:
+            future = _run_in_background(_extract, images_bytes[0], *st.session_state.ocr_config, preserve_structure)
         else:
-            text = processor.extract_text(image)
+            future = _run_in_background(_extract_batch, tuple(images_bytes), *st.session_state.ocr_config, preserve_structure)
         
-        # Get confidence score
-        confidence = processor.get_confidence_score(image)
+        # Poll instead of blocking so progress keeps updating; if the user interacts
+        # meanwhile, the rerun stops this loop but the OCR still completes into the cache
+        status = st.empty()
+        while not future.done():
+            status.caption(f"⏳ Running OCR... {time.time() - start_time:.0f}s elapsed")
+            time.sleep(0.2)
+        status.empty()
+        
+        if len(images_bytes) == 1:
+            text, confidence = future.result()
+        else:
+            results = future.result()
+            text = '\n\n'.join(page_text for page_text, _ in results)
+            confidence = sum(page_conf for _, page_conf in results) / len(results)
         
         processing_time = time.time() - start_time
         
@@ -128,15 +211,81 @@ def generate_word_document(text, confidence_score=None):
             confidence_score=confidence_score
         )
         
-        # Save to bytes for download
-        doc_bytes = generator.save_to_bytes()
-        return doc_bytes
+        # Serialize into a BytesIO that the download button streams directly
+        return generator.save_to_bytes()
     
     except Exception as e:
         st.error(f"❌ Error generating Word document: {str(e)}")
         return None
 
 
+# Partial reruns need Streamlit >= 1.33 (st.experimental_fragment, st.fragment from 1.37);
+# older versions simply rerun the whole script as before
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+
+@_fragment
+def _text_panel():
+    """Extracted-text editor, stats and export buttons; edits here rerun only this panel"""
+    st.header("📝 Extracted Text")
+    
+    if st.session_state.extracted_text:
+        # Display extracted text
+        text_area = st.text_area(
+            "Edit extracted text if needed:",
+            value=st.session_state.extracted_text,
+            height=400,
+            help="You can edit the text before generating the Word document"
+        )
+        
+        # Update session state if text is edited
+        if text_area != st.session_state.extracted_text:
+            st.session_state.extracted_text = text_area
+        
+        # Stats
+        word_count = len(st.session_state.extracted_text.split())
+        char_count = len(st.session_state.extracted_text)
+        st.caption(f"📊 Words: {word_count} | Characters: {char_count}")
+        
+        # Generate Word document button
+        st.markdown("---")
+        col_a, col_b = st.columns(2)
+        
+        with col_a:
+            if st.button("📥 Generate Word Document", type="primary"):
+                with st.spinner("📝 Creating Word document..."):
+                    doc_buffer = generate_word_document(
+                        st.session_state.extracted_text,
+                        st.session_state.confidence_score
+                    )
+                    
+                    if doc_buffer:
+                        st.success("✅ Word document created!")
+                        
+                        # Generate filename
+                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                        filename = f"ocr_extracted_{timestamp}.docx"
+                        
+                        # Download button
+                        st.download_button(
+                            label="⬇️ Download Word Document",
+                            data=doc_buffer,
+                            file_name=filename,
+                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                        )
+        
+        with col_b:
+            # Clear button
+            if st.button("🗑️ Clear"):
+                st.session_state.extracted_text = ""
+                st.session_state.confidence_score = 0.0
+                st.session_state.processing_time = 0.0
+                st.rerun()
+    
+    else:
+        st.info("👈 Upload images and click 'Extract Text' to see results here")
+
+
 # Main App
 def main():
     # Header
@@ -258,29 +407,31 @@ def main():
         st.header("📤 Upload Image")
         
         # File uploader
-        uploaded_file = st.file_uploader(
-            "Choose an image file",
+        uploaded_files = st.file_uploader(
+            "Choose image files",
             type=['jpg', 'jpeg', 'png'],
-            help="Upload an image containing text you want to extract"
+            accept_multiple_files=True,
+            help="Upload one or more images containing text you want to extract"
         )
         
-        if uploaded_file is not None:
-            # Display uploaded image
-            image = Image.open(uploaded_file)
-            st.image(image, caption="Uploaded Image", use_column_width=True)
-            
-            # Image info
-            st.caption(f"📊 Image size: {image.width} x {image.height} pixels")
+        if uploaded_files:
+            # Display uploaded images
+            for uploaded_file in uploaded_files:
+                image = Image.open(uploaded_file)
+                st.image(image, caption=uploaded_file.name, use_column_width=True)
+                
+                # Image info
+                st.caption(f"📊 Image size: {image.width} x {image.height} pixels")
             
             # Process button
             if st.button("🔍 Extract Text", type="primary"):
                 # Check if OCR is initialized
-                if st.session_state.ocr_processor is None:
+                if st.session_state.ocr_config is None:
                     st.warning("⚠️ Please initialize OCR engine first (see sidebar)")
                 else:
                     try:
                         with st.spinner("🔄 Processing image... This may take 10-30 seconds..."):
-                            text, confidence, proc_time = process_image(image, preserve_structure)
+                            text, confidence, proc_time = process_image([f.getvalue() for f in uploaded_files], preserve_structure)
                             
                             if text is not None:
                                 st.session_state.extracted_text = text
@@ -299,63 +450,7 @@ def main():
                         st.info("💡 Try switching to a different OCR engine or reinitialize")
     
     with col2:
-        st.header("📝 Extracted Text")
-        
-        if st.session_state.extracted_text:
-            # Display extracted text
-            text_area = st.text_area(
-                "Edit extracted text if needed:",
-                value=st.session_state.extracted_text,
-                height=400,
-                help="You can edit the text before generating the Word document"
-            )
-            
-            # Update session state if text is edited
-            if text_area != st.session_state.extracted_text:
-                st.session_state.extracted_text = text_area
-            
-            # Stats
-            word_count = len(st.session_state.extracted_text.split())
-            char_count = len(st.session_state.extracted_text)
-            st.caption(f"📊 Words: {word_count} | Characters: {char_count}")
-            
-            # Generate Word document button
-            st.markdown("---")
-            col_a, col_b = st.columns(2)
-            
-            with col_a:
-                if st.button("📥 Generate Word Document", type="primary"):
-                    with st.spinner("📝 Creating Word document..."):
-                        doc_bytes = generate_word_document(
-                            st.session_state.extracted_text,
-                            st.session_state.confidence_score
-                        )
-                        
-                        if doc_bytes:
-                            st.success("✅ Word document created!")
-                            
-                            # Generate filename
-                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            filename = f"ocr_extracted_{timestamp}.docx"
-                            
-                            # Download button
-                            st.download_button(
-                                label="⬇️ Download Word Document",
-                                data=doc_bytes,
-                                file_name=filename,
-                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                            )
-            
-            with col_b:
-                # Clear button
-                if st.button("🗑️ Clear"):
-                    st.session_state.extracted_text = ""
-                    st.session_state.confidence_score = 0.0
-                    st.session_state.processing_time = 0.0
-                    st.rerun()
-        
-        else:
-            st.info("👈 Upload an image and click 'Extract Text' to see results here")
+        _text_panel()
     
     # Footer
     st.markdown("---")
@@ -2,15 +2,25 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
+import numpy as np
 import threading
 import os
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 
 # Import utilities
 from utils.ocr_processor import OCRProcessor
 from utils.docx_generator import DocxGenerator
 
+# Longest image side handed to OCR; larger photos are downscaled first
+MAX_IMAGE_SIDE = 1600
+
 class OCRDesktopApp:
+    # Initialized processors shared by engine selection and the Tesseract fallback
+    _engine_cache = {}
+    _engine_lock = threading.Lock()
+    
     def __init__(self, root):
         self.root = root
         self.root.title("OCR Image to Word Converter")
@@ -18,8 +28,7 @@ class OCRDesktopApp:
         
         # State variables
         self.ocr_processor = None
-        self.current_image_path = None
-        self.current_image = None
+        self.current_image_path = None  # Full image is only opened while processing
         self.extracted_data = None
         self.extracted_text = ""
         self.confidence_score = 0.0
@@ -106,13 +115,23 @@ class OCRDesktopApp:
         engine = self.engine_var.get()
         threading.Thread(target=self.init_ocr, args=(engine,), daemon=True).start()
 
+    @classmethod
+    def _get_or_create(cls, engine):
+        """Return the initialized processor for engine, loading its models only once"""
+        with cls._engine_lock:
+            processor = cls._engine_cache.get(engine)
+            if processor is None:
+                processor = OCRProcessor(engine=engine)
+                processor.initialize_reader()
+                cls._engine_cache[engine] = processor
+            return processor
+
     def init_ocr(self, engine):
         self.update_status(f"Initializing {engine}...")
         try:
-            self.ocr_processor = OCRProcessor(engine=engine)
-            self.ocr_processor.initialize_reader()
+            self.ocr_processor = self._get_or_create(engine)
             self.update_status(f"{engine} initialized successfully.")
-            self.root.after(0, lambda: self.process_btn.configure(state=tk.NORMAL if self.current_image else tk.DISABLED))
+            self.root.after(0, lambda: self.process_btn.configure(state=tk.NORMAL if self.current_image_path else tk.DISABLED))
         except Exception as e:
             print(f"Failed to initialize {engine}: {e}")
             if engine != 'easyocr':
@@ -128,12 +147,13 @@ class OCRDesktopApp:
         file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.jpg;*.jpeg;*.png;*.bmp")])
         if file_path:
             self.current_image_path = file_path
-            self.current_image = Image.open(file_path)
             
-            # Resize for preview
-            display_img = self.current_image.copy()
-            display_img.thumbnail((500, 500))
-            photo = ImageTk.PhotoImage(display_img)
+            # Resize for preview; only the thumbnail is kept in memory.
+            # draft() makes libjpeg decode at a reduced DCT scale instead of full size
+            with Image.open(file_path) as display_img:
+                display_img.draft('RGB', (500, 500))
+                display_img.thumbnail((500, 500), Image.LANCZOS)
+                photo = ImageTk.PhotoImage(display_img)
             
             self.img_label.configure(image=photo, text="")
             self.img_label.image = photo  # Keep reference
@@ -142,7 +162,7 @@ class OCRDesktopApp:
             self.status_label.configure(text=f"Loaded: {os.path.basename(file_path)}")
 
     def start_processing(self):
-        if not self.current_image:
+        if not self.current_image_path:
             return
             
         self.process_btn.configure(state=tk.DISABLED)
@@ -158,12 +178,21 @@ class OCRDesktopApp:
         try:
             advanced_preprocess = self.preprocess_var.get()
             
-            # If using tesseract, we get structured data
-            if self.engine_var.get() == 'tesseract':
-                self._process_tesseract(advanced_preprocess)
-            else:
-                # Other engines
-                self._process_standard(advanced_preprocess)
+            # Reopen the full-resolution image only for the duration of the OCR run
+            with Image.open(self.current_image_path) as pil_image:
+                if max(pil_image.size) > MAX_IMAGE_SIDE:
+                    # thumbnail() lets the JPEG decoder downscale while decoding
+                    pil_image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+                
+                # Decode to an RGB array once; every OCR call below reuses it
+                image = np.asarray(pil_image.convert('RGB'))
+                
+                # If using tesseract, we get structured data
+                if self.engine_var.get() == 'tesseract':
+                    self._process_tesseract(image, advanced_preprocess)
+                else:
+                    # Other engines
+                    self._process_standard(image, advanced_preprocess)
                 
             self.root.after(0, self.processing_complete)
             
@@ -172,18 +201,19 @@ class OCRDesktopApp:
             error_msg = str(e)
             self.root.after(0, lambda msg=error_msg: self.processing_error(msg))
 
-    def _process_tesseract(self, advanced_preprocess=True):
+    def _process_tesseract(self, image, advanced_preprocess=True):
         """Handle Tesseract specific processing with fallback"""
         if self.ocr_processor.use_tesseract:
             try:
-                self.extracted_data = self.ocr_processor.extract_text_with_formatting(self.current_image, advanced_preprocess=advanced_preprocess)
+                self.extracted_data = self.ocr_processor.extract_text_with_formatting(image, advanced_preprocess=advanced_preprocess)
                 self._flatten_structured_data()
-                self.confidence_score = self.ocr_processor.get_confidence_score(self.current_image, advanced_preprocess=advanced_preprocess)
+                # Word confidences come back with the structured data, no second Tesseract pass needed
+                self.confidence_score = OCRProcessor.structured_confidence(self.extracted_data)
             except Exception as e:
                 # Fallback to EasyOCR if Tesseract runtime fails
                 print(f"Tesseract failed: {e}. Falling back to EasyOCR.")
                 self.root.after(0, lambda: messagebox.showwarning("Tesseract Error", "Tesseract execution failed. Using EasyOCR as fallback."))
-                self._fallback_to_easyocr(advanced_preprocess)
+                self._fallback_to_easyocr(image, advanced_preprocess)
         else:
             # Tesseract not installed/found - use EasyOCR
             self.root.after(0, lambda: messagebox.showwarning(
@@ -193,48 +223,32 @@ class OCRDesktopApp:
                 "https://github.com/UB-Mannheim/tesseract/wiki\n\n"
                 "Using EasyOCR as fallback."
             ))
-            self._fallback_to_easyocr(advanced_preprocess)
+            self._fallback_to_easyocr(image, advanced_preprocess)
 
-    def _fallback_to_easyocr(self, advanced_preprocess=True):
+    def _fallback_to_easyocr(self, image, advanced_preprocess=True):
         """Fallback to EasyOCR when Tesseract is unavailable"""
         try:
-            # Create a temporary EasyOCR processor for fallback
-            fallback_processor = OCRProcessor(engine='easyocr')
-            fallback_processor.initialize_reader()
-            self.extracted_text = fallback_processor.extract_text(self.current_image, advanced_preprocess=advanced_preprocess)
+            # Reuse the EasyOCR processor if it was already loaded
+            fallback_processor = self._get_or_create('easyocr')
+            self.extracted_text, self.confidence_score = fallback_processor.extract_text_and_confidence(image, advanced_preprocess=advanced_preprocess)
             self.extracted_data = [{'text': self.extracted_text}]
-            self.confidence_score = fallback_processor.get_confidence_score(self.current_image, advanced_preprocess=advanced_preprocess)
         except Exception as e:
             print(f"EasyOCR fallback also failed: {e}")
             self.extracted_text = ""
             self.extracted_data = [{'text': ''}]
             self.confidence_score = 0.0
 
-    def _process_standard(self, advanced_preprocess=True):
+    def _process_standard(self, image, advanced_preprocess=True):
         """Handle standard OCR processing"""
-        self.extracted_text = self.ocr_processor.extract_text(self.current_image, advanced_preprocess=advanced_preprocess)
+        self.extracted_text, self.confidence_score = self.ocr_processor.extract_text_and_confidence(image, advanced_preprocess=advanced_preprocess)
         self.extracted_data = [{'text': self.extracted_text}]
-        self.confidence_score = self.ocr_processor.get_confidence_score(self.current_image, advanced_preprocess=advanced_preprocess)
 
     def _flatten_structured_data(self):
-        """Convert structured data to plain text for display"""
-        text_lines = []
-        current_block = -1
-        current_para = -1
-        line_buffer = []
-        
-        for item in self.extracted_data:
-            if item['block'] != current_block or item['para'] != current_para:
-                if line_buffer:
-                    text_lines.append(' '.join(line_buffer))
-                    line_buffer = []
-                current_block = item['block']
-                current_para = item['para']
-            line_buffer.append(item['text'])
-        if line_buffer:
-            text_lines.append(' '.join(line_buffer))
-            
-        self.extracted_text = '\n'.join(text_lines)
+        """Convert structured data to plain text for display (one line per paragraph)"""
+        paragraphs = groupby(self.extracted_data, key=itemgetter('block', 'para'))
+        self.extracted_text = '\n'.join(
+            ' '.join(item['text'] for item in words) for _, words in paragraphs
+        )
 
     def processing_complete(self):
         self.progress.stop()
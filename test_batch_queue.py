@@ -0,0 +1,76 @@
+
+import os
+import sys
+import time
+import threading
+
+# Ensure we can import from utils
+sys.path.append(os.getcwd())
+
+from utils.batch_queue import BatchQueue
+
+# Every wait below is bounded, so a regression fails instead of hanging
+TIMEOUT = 5
+
+def test_order():
+    print("Testing result order...")
+    queue = BatchQueue(lambda items: [item * 2 for item in items], max_batch_size=4, max_wait_time=0.05)
+    futures = [queue.submit(i) for i in range(10)]
+    results = [future.result(timeout=TIMEOUT) for future in futures]
+    assert results == [i * 2 for i in range(10)], results
+    print("Results come back in submission order.")
+
+def test_batch_limits():
+    print("Testing max_batch_size / max_wait_time...")
+    sizes = []
+    def record(items):
+        sizes.append(len(items))
+        return items
+    queue = BatchQueue(record, max_batch_size=3, max_wait_time=0.2)
+    futures = [queue.submit(i) for i in range(7)]
+    for future in futures:
+        future.result(timeout=TIMEOUT)
+    assert max(sizes) <= 3, sizes
+    assert sum(sizes) == 7, sizes
+    
+    # A lone item is dispatched once max_wait_time expires, not held for a full batch
+    start = time.monotonic()
+    queue.submit('alone').result(timeout=TIMEOUT)
+    waited = time.monotonic() - start
+    assert waited < 0.2 + 1.0, waited
+    print(f"Batch sizes: {sizes}; lone item waited {waited:.2f} s.")
+
+def test_exception():
+    print("Testing batch_fn exceptions...")
+    gate = threading.Event()
+    def fail(items):
+        gate.wait(TIMEOUT)
+        raise RuntimeError("boom")
+    queue = BatchQueue(fail, max_batch_size=8, max_wait_time=0.1)
+    futures = [queue.submit(i) for i in range(3)]
+    gate.set()
+    for future in futures:
+        error = future.exception(timeout=TIMEOUT)
+        assert isinstance(error, RuntimeError), error
+    print("Every future received the exception.")
+
+def test_short_results():
+    print("Testing batch_fn returning fewer results than inputs...")
+    gate = threading.Event()
+    def short(items):
+        gate.wait(TIMEOUT)
+        return items[:-1]
+    queue = BatchQueue(short, max_batch_size=8, max_wait_time=0.1)
+    futures = [queue.submit(i) for i in range(3)]
+    gate.set()
+    for future in futures:
+        error = future.exception(timeout=TIMEOUT)
+        assert isinstance(error, ValueError), error
+    print("Every future failed instead of blocking.")
+
+if __name__ == "__main__":
+    test_order()
+    test_batch_limits()
+    test_exception()
+    test_short_results()
+    print("\nVerification Successful: BatchQueue.")
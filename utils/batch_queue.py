@@ -0,0 +1,83 @@
+"""
+Batch Queue Module
+Coalesces OCR requests from many threads into batched calls on one worker thread
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchQueue:
+    """Collect requests submitted from any thread and run them through one batched function"""
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_time=0.1):
+        """
+        Start the batching worker
+
+        Args:
+            batch_fn: Callable taking a list of items and returning one result per item, in order
+            max_batch_size: Maximum number of items passed to a single batch_fn call (default: 8)
+            max_wait_time: Seconds to wait for more items once the first one arrives (default: 0.1)
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self._queue = queue.Queue()
+
+        # A single worker keeps one batch on the device at a time
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """
+        Queue an item for the next batch
+
+        Args:
+            item: Input passed to batch_fn as part of a list
+
+        Returns:
+            concurrent.futures.Future resolving to the item's result
+        """
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self):
+        """Block for one item, then gather more until the batch is full or the wait expires"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_time
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Worker loop: dispatch each collected batch and resolve its futures"""
+        while True:
+            # Skip requests whose caller cancelled them while they were queued
+            batch = [(item, future) for item, future in self._collect()
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                results = list(self.batch_fn([item for item, _ in batch]))
+                if len(results) != len(batch):
+                    # A short result list would leave the unmatched futures pending forever
+                    raise ValueError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
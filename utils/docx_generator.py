@@ -140,7 +140,9 @@ class DocxGenerator:
         Save document to bytes (for download in Streamlit)
         
         Returns:
-            BytesIO object containing the document
+            BytesIO object containing the document, rewound to the start.
+            The buffer itself is returned (no getvalue() copy), so it can be
+            passed straight to st.download_button.
         """
         if self.document is None:
             raise ValueError("No document created. Call create_document() first.")
@@ -0,0 +1,173 @@
+
+"""
+Long-lived OCR server for verify_extraction.py --server
+
+Keeps the OCR engines loaded between verification runs. Clients send one JSON
+line per request and receive one JSON line back:
+
+    {"engine": ..., "paths": [...], "fast": false, "precision": null}
+    {"outputs": [[length, sample], ...], "error": null, "version": null, "elapsed": 0.0}
+
+Only one server runs at a time (it holds an exclusive lock on the PID file). It
+exits after VERIFY_SERVER_IDLE seconds without requests (default: 1800, 0 never)
+or when stopped with `python verify_server.py --stop`.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import socket
+import argparse
+import tempfile
+import threading
+import socketserver
+
+from verify_extraction import test_engine
+
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'verify_ocr.sock')
+PID_PATH = os.path.join(tempfile.gettempdir(), 'verify_ocr.pid')
+# Used where AF_UNIX is unavailable (older Windows builds)
+TCP_ADDRESS = ('127.0.0.1', 47613)
+
+HAS_UNIX = hasattr(socket, 'AF_UNIX')
+
+IDLE_TIMEOUT = float(os.environ.get('VERIFY_SERVER_IDLE', '1800'))
+
+# Requests in progress and the time the last one finished, for the idle exit
+_activity = {'active': 0, 'last': time.monotonic()}
+_activity_lock = threading.Lock()
+
+# One request per engine at a time: the Paddle predictor in particular is not
+# safe to share between threads
+_ENGINE_LOCKS = {}
+_ENGINE_LOCKS_GUARD = threading.Lock()
+
+def _engine_lock(engine_name):
+    with _ENGINE_LOCKS_GUARD:
+        return _ENGINE_LOCKS.setdefault(engine_name, threading.Lock())
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            request = json.loads(line)
+            if request.get('command') == 'stop':
+                self.wfile.write(b'{"stopped": true}\n')
+                self.wfile.flush()
+                # shutdown() waits for serve_forever, so it cannot run on a handler thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            engine_name = request['engine']
+            with _activity_lock:
+                _activity['active'] += 1
+            try:
+                with _engine_lock(engine_name):
+                    _, outputs, error, version, elapsed = test_engine(
+                        engine_name, request['paths'], request.get('fast', False), request.get('precision')
+                    )
+            finally:
+                with _activity_lock:
+                    _activity['active'] -= 1
+                    _activity['last'] = time.monotonic()
+            response = {'outputs': outputs, 'error': error, 'version': version, 'elapsed': elapsed}
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+def _idle_watchdog(server):
+    """Shut the server down once it has been idle for IDLE_TIMEOUT seconds"""
+    while True:
+        time.sleep(min(60.0, IDLE_TIMEOUT))
+        with _activity_lock:
+            idle = _activity['active'] == 0 and time.monotonic() - _activity['last'] > IDLE_TIMEOUT
+        if idle:
+            print("verify_server idle, exiting", file=sys.stderr)
+            server.shutdown()
+            return
+
+def _lock_instance():
+    """
+    Take an exclusive lock on the PID file and write our PID into it
+
+    Returns the open file (the lock lasts as long as it stays open, and the OS
+    drops it if the process dies), or None when another server holds it.
+    """
+    lock_file = open(PID_PATH, 'a+')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    return lock_file
+
+def _cleanup(lock_file):
+    # Remove the files while still holding the lock, so a server starting up
+    # meanwhile cannot have its fresh socket unlinked by us
+    for path in (SOCKET_PATH if HAS_UNIX else None, PID_PATH):
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
+    lock_file.close()
+
+def stop():
+    """Ask a running server to exit; returns False if none is reachable"""
+    try:
+        if HAS_UNIX:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(SOCKET_PATH)
+        else:
+            sock = socket.create_connection(TCP_ADDRESS)
+    except OSError:
+        return False
+    with sock, sock.makefile('rwb') as stream:
+        stream.write(b'{"command": "stop"}\n')
+        stream.flush()
+        stream.readline()
+    return True
+
+def serve():
+    # A second server (e.g. spawned by a concurrent client) exits here, before it
+    # can unlink the running server's socket
+    lock_file = _lock_instance()
+    if lock_file is None:
+        print("verify_server already running", file=sys.stderr)
+        return
+    atexit.register(_cleanup, lock_file)
+
+    if HAS_UNIX:
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+        server = socketserver.ThreadingUnixStreamServer(SOCKET_PATH, Handler)
+    else:
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer(TCP_ADDRESS, Handler)
+    server.daemon_threads = True
+    if IDLE_TIMEOUT > 0:
+        threading.Thread(target=_idle_watchdog, args=(server,), daemon=True).start()
+
+    print(f"verify_server listening on {SOCKET_PATH if HAS_UNIX else TCP_ADDRESS}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Persistent OCR server for verify_extraction.py --server")
+    parser.add_argument('--stop', action='store_true', help="stop the running server and exit")
+    args = parser.parse_args()
+    if args.stop:
+        print("verify_server stopped" if stop() else "verify_server not running", file=sys.stderr)
+    else:
+        serve()